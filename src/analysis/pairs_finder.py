@@ -3,14 +3,15 @@ Pairs Finder - Discovers cointegrated trading pairs
 =================================================
 """
 
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass
-from typing import List
+from typing import Callable, List, Optional, Tuple
 from ..data.data_manager import DataManager
 from .statistical import StatisticalAnalyzer
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TradingPair:
     """Data class to represent a trading pair"""
     symbol1: str
@@ -22,72 +23,148 @@ class TradingPair:
     spread_std: float
 
 
+@dataclass
+class PairScreenResult:
+    """
+    Raw test results for every pair of a symbol set, before thresholds
+    
+    Results are condensed arrays of length K*(K-1)//2; entry k belongs to
+    the k-th pair (i, j) of itertools.combinations(range(K), 2), which is
+    the order of np.triu_indices(K, 1).
+    """
+    symbols: List[str]
+    hedge_ratios: np.ndarray
+    cointegration_pvalues: np.ndarray
+    adf_pvalues: np.ndarray
+    n_candidates: int = 0
+    
+    def pair_indices(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Column indices (i, j) of every condensed entry"""
+        return np.triu_indices(len(self.symbols), 1)
+
+
 class PairsFinder:
     """Finds and validates trading pairs"""
     
     def __init__(self, data_manager: DataManager, 
                  cointegration_threshold: float = 0.05,
-                 adf_threshold: float = 0.05):
+                 adf_threshold: float = 0.05,
+                 corr_threshold: float = 0.8):
         self.data_manager = data_manager
         self.cointegration_threshold = cointegration_threshold
         self.adf_threshold = adf_threshold
+        self.corr_threshold = corr_threshold
         self.analyzer = StatisticalAnalyzer()
     
-    def find_pairs(self, symbols: List[str]) -> List[TradingPair]:
+    def find_pairs(self, symbols: List[str],
+                   progress_callback: Optional[Callable[[float], None]] = None) -> List[TradingPair]:
         """
         Find cointegrated pairs from a list of symbols
         
         Args:
             symbols: List of stock symbols to analyze
+            progress_callback: Optional function called with the completed
+                fraction (0.0 to 1.0) as the screen advances
+            
+        Returns:
+            List of valid TradingPair objects
+        """
+        return self.select_pairs(self.screen_pairs(symbols, progress_callback))
+    
+    def screen_pairs(self, symbols: List[str],
+                     progress_callback: Optional[Callable[[float], None]] = None) -> PairScreenResult:
+        """
+        Run the cointegration tests for a list of symbols without applying
+        the p-value thresholds
+        
+        Args:
+            symbols: List of stock symbols to analyze
+            progress_callback: Optional function called with the completed
+                fraction (0.0 to 1.0) as the screen advances
+            
+        Returns:
+            PairScreenResult with condensed arrays of test results; pairs
+            rejected by the correlation prefilter keep p-values of 1.0
+        """
+        if progress_callback is None:
+            progress_callback = lambda fraction: None
+        
+        prices, symbols = self.data_manager.get_price_matrix(symbols)
+        n_symbols = len(symbols)
+        total_combinations = n_symbols * (n_symbols - 1) // 2
+        progress_callback(0.0)
+        
+        coint_pvalues = np.ones(total_combinations)
+        adf_pvalues = np.ones(total_combinations)
+        if total_combinations == 0:
+            progress_callback(1.0)
+            return PairScreenResult(symbols, np.zeros(0, dtype=np.float32), coint_pvalues, adf_pvalues)
+        
+        # Cheap prefilter: only strongly correlated pairs get tested
+        correlations = np.corrcoef(np.log(prices).T)
+        rows, cols = np.triu_indices(n_symbols, 1)
+        keep = np.abs(correlations[rows, cols]) >= self.corr_threshold
+        progress_callback(0.1)
+        
+        # Hedge ratios and cointegration tests for all candidates at once;
+        # the gram matrix only needs single precision
+        prices32, _ = self.data_manager.get_price_matrix(symbols, dtype=np.float32)
+        hedge_ratios = self.analyzer.batch_hedge_ratios(prices32)
+        progress_callback(0.2)
+        coint_pvalues[keep], adf_pvalues[keep] = self.analyzer.batch_cointegration(
+            prices, hedge_ratios, (rows[keep], cols[keep]),
+            lambda fraction: progress_callback(0.2 + 0.8 * fraction)
+        )
+        progress_callback(1.0)
+        
+        return PairScreenResult(symbols, hedge_ratios[rows, cols], coint_pvalues, adf_pvalues,
+                                int(keep.sum()))
+    
+    def select_pairs(self, result: PairScreenResult) -> List[TradingPair]:
+        """
+        Apply the p-value thresholds to screened pairs
+        
+        Args:
+            result: Output of screen_pairs
             
         Returns:
             List of valid TradingPair objects
         """
         valid_pairs = []
-        total_combinations = len(symbols) * (len(symbols) - 1) // 2
-        current_combination = 0
+        symbols = result.symbols
+        total_combinations = len(result.adf_pvalues)
         
-        print(f"Analyzing {total_combinations} possible pairs...")
+        # Check which pairs meet our criteria
+        mask = ((result.cointegration_pvalues <= self.cointegration_threshold) &
+                (result.adf_pvalues <= self.adf_threshold))
+        accepted = np.flatnonzero(mask)
+        if len(accepted):
+            # Make sure the aligned matrix holds the screened symbols; its
+            # column order may differ, so columns are looked up by symbol
+            self.data_manager.get_price_matrix(symbols)
+        rows, cols = result.pair_indices()
         
-        for i in range(len(symbols)):
-            for j in range(i + 1, len(symbols)):
-                current_combination += 1
-                symbol1, symbol2 = symbols[i], symbols[j]
-                
-                if current_combination % 10 == 0:
-                    print(f"Progress: {current_combination}/{total_combinations}")
-                
-                try:
-                    price1 = self.data_manager.get_price_series(symbol1)
-                    price2 = self.data_manager.get_price_series(symbol2)
-                    
-                    # Test cointegration
-                    coint_pvalue, hedge_ratio, adf_pvalue = self.analyzer.test_cointegration(price1, price2)
-                    
-                    # Check if pair meets our criteria
-                    if (coint_pvalue <= self.cointegration_threshold and 
-                        adf_pvalue <= self.adf_threshold):
-                        
-                        # Calculate spread statistics
-                        spread_mean, spread_std = self.analyzer.calculate_spread_stats(
-                            price1, price2, hedge_ratio
-                        )
-                        
-                        pair = TradingPair(
-                            symbol1=symbol1,
-                            symbol2=symbol2,
-                            hedge_ratio=hedge_ratio,
-                            cointegration_pvalue=coint_pvalue,
-                            adf_pvalue=adf_pvalue,
-                            spread_mean=spread_mean,
-                            spread_std=spread_std
-                        )
-                        
-                        valid_pairs.append(pair)
-                        print(f"✓ Found pair: {symbol1}-{symbol2} (coint_p: {coint_pvalue:.4f}, adf_p: {adf_pvalue:.4f})")
-                
-                except Exception as e:
-                    continue  # Skip this pair if there's an error
+        for k in accepted:
+            i, j = rows[k], cols[k]
+            symbol1, symbol2 = symbols[i], symbols[j]
+            hedge_ratio = result.hedge_ratios[k]
+            
+            # Calculate spread statistics
+            y, x = self.data_manager.get_prices(symbol1, symbol2)
+            spread_mean, spread_std = self.analyzer.calculate_spread_stats(y, x, hedge_ratio)
+            
+            pair = TradingPair(
+                symbol1=symbol1,
+                symbol2=symbol2,
+                hedge_ratio=float(hedge_ratio),
+                cointegration_pvalue=float(result.cointegration_pvalues[k]),
+                adf_pvalue=float(result.adf_pvalues[k]),
+                spread_mean=spread_mean,
+                spread_std=spread_std
+            )
+            
+            valid_pairs.append(pair)
         
-        print(f"\nFound {len(valid_pairs)} valid pairs out of {total_combinations} combinations")
+        print(f"Found {len(valid_pairs)} valid pairs out of {total_combinations} combinations "
+              f"({result.n_candidates} tested after the correlation prefilter)")
         return valid_pairs
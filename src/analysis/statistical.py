@@ -5,60 +5,172 @@ Statistical Analysis - Cointegration and statistical tests
 
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.stattools import adfuller, coint
-from statsmodels.regression.linear_model import OLS
-from typing import Tuple
+from typing import Callable, Optional, Tuple
+from ._adf_numba import (NUMBA_AVAILABLE, adf_tstat, screen, spread_mean_std,
+                         tstat_to_coint_pvalue, tstat_to_pvalue)
+
+
+def _adf_lags(nobs: int) -> int:
+    """Fixed ADF lag order for a series of nobs observations (Schwert rule)"""
+    return int(np.ceil(12 * (nobs / 100) ** 0.25))
+
+
+def _pair_tstat(prices: np.ndarray, hedge_ratio: float, eg_slope: float, eg_intercept: float,
+                i: int, j: int, lags: int) -> Tuple[float, float]:
+    """Engle-Granger and spread ADF t-statistics of a single pair, used by the joblib fallback"""
+    resid = prices[:, i] - eg_intercept - eg_slope * prices[:, j]
+    spread = prices[:, i] - hedge_ratio * prices[:, j]
+    return adf_tstat(resid, lags, False), adf_tstat(spread, lags, True)
 
 
 class StatisticalAnalyzer:
     """Performs cointegration analysis and statistical tests"""
     
     @staticmethod
-    def test_cointegration(price1: pd.Series, price2: pd.Series) -> Tuple[float, float, float]:
+    def align_prices(price1: pd.Series, price2: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Test for cointegration between two price series
+        Align two price series by date
         
         Returns:
-            (cointegration_pvalue, hedge_ratio, adf_pvalue)
+            (y, x) float64 arrays holding the dates both series share
         """
-        # Align the series by dates
         aligned_data = pd.concat([price1, price2], axis=1).dropna()
-        if len(aligned_data) < 30:
-            return 1.0, 0.0, 1.0  # Not enough data
+        y = aligned_data.iloc[:, 0].to_numpy(dtype=np.float64)
+        x = aligned_data.iloc[:, 1].to_numpy(dtype=np.float64)
+        return y, x
+    
+    @staticmethod
+    def test_cointegration(y: np.ndarray, x: np.ndarray) -> Tuple[float, float, float]:
+        """
+        Test for cointegration between two aligned price arrays
         
-        y = aligned_data.iloc[:, 0]
-        x = aligned_data.iloc[:, 1]
+        Returns:
+            (cointegration_pvalue, hedge_ratio, adf_pvalue)
+        """
+        if len(y) < 30:
+            return 1.0, 0.0, 1.0  # Not enough data
         
-        # Perform cointegration test
-        coint_stat, coint_pvalue, _ = coint(y, x)
+        lags = _adf_lags(len(y))
         
-        # Calculate hedge ratio using OLS regression
-        model = OLS(y, x).fit()
-        hedge_ratio = model.params[0]
+        # Engle-Granger: OLS of y on (1, x), then a no-constant ADF test of
+        # the residual
+        xc = x - x.mean()
+        eg_slope = np.dot(xc, y - y.mean()) / np.dot(xc, xc)
+        eg_intercept = y.mean() - eg_slope * x.mean()
+        coint_tstat = adf_tstat(y - eg_intercept - eg_slope * x, lags, False)
+        coint_pvalue = tstat_to_coint_pvalue(coint_tstat)
         
-        # Calculate spread and test for stationarity
+        # Traded hedge ratio from a no-intercept OLS of y on x, and the ADF
+        # test of the resulting spread
+        hedge_ratio = float(np.dot(x, y) / np.dot(x, x))
         spread = y - hedge_ratio * x
-        adf_stat, adf_pvalue, _, _, _, _ = adfuller(spread, autolag='AIC')
+        adf_pvalue = tstat_to_pvalue(adf_tstat(spread, lags, True))
         
-        return coint_pvalue, hedge_ratio, adf_pvalue
+        return float(coint_pvalue), hedge_ratio, float(adf_pvalue)
     
     @staticmethod
-    def calculate_spread_stats(price1: pd.Series, price2: pd.Series, hedge_ratio: float) -> Tuple[float, float]:
-        """Calculate spread mean and standard deviation"""
-        aligned_data = pd.concat([price1, price2], axis=1).dropna()
-        y = aligned_data.iloc[:, 0]
-        x = aligned_data.iloc[:, 1]
+    def batch_hedge_ratios(prices: np.ndarray) -> np.ndarray:
+        """
+        Calculate hedge ratios for every pair of columns in one pass
         
-        spread = y - hedge_ratio * x
-        return spread.mean(), spread.std()
+        Args:
+            prices: (T, K) matrix of aligned prices; float32 input keeps the
+                gram matrix (and the result) in single precision
+            
+        Returns:
+            (K, K) matrix where H[i, j] is the OLS slope (no intercept)
+            of column i regressed on column j
+        """
+        gram = prices.T @ prices
+        return gram / np.diag(gram)[None, :]
     
     @staticmethod
-    def calculate_spread(price1: pd.Series, price2: pd.Series, hedge_ratio: float) -> pd.Series:
-        """Calculate the spread between two price series"""
-        aligned_data = pd.concat([price1, price2], axis=1).dropna()
-        y = aligned_data.iloc[:, 0]
-        x = aligned_data.iloc[:, 1]
+    def batch_regressions(prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fit the Engle-Granger regression (with intercept) for every pair of columns
         
-        spread = y - hedge_ratio * x
-        spread.name = f"Spread_{price1.name}_{price2.name}"
-        return spread
+        Args:
+            prices: (T, K) matrix of aligned prices
+            
+        Returns:
+            (slopes, intercepts) as (K, K) matrices where column i is
+            regressed on (1, column j) with coefficients
+            (intercepts[i, j], slopes[i, j])
+        """
+        means = prices.mean(axis=0)
+        centered = prices - means
+        gram = centered.T @ centered
+        slopes = gram / np.diag(gram)[None, :]
+        intercepts = means[:, None] - slopes * means[None, :]
+        return slopes, intercepts
+    
+    @staticmethod
+    def batch_cointegration(prices: np.ndarray, hedge_ratios: np.ndarray,
+                            candidates: Tuple[np.ndarray, np.ndarray] = None,
+                            progress_callback: Optional[Callable[[float], None]] = None,
+                            n_chunks: int = 100) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Test cointegration for many pairs of columns at once
+        
+        Args:
+            prices: (T, K) matrix of aligned prices
+            hedge_ratios: (K, K) matrix from batch_hedge_ratios
+            candidates: (rows, cols) index arrays of the pairs to test
+                (defaults to every pair i < j, in np.triu_indices order)
+            progress_callback: Optional function called with the completed
+                fraction (0.0 to 1.0) after each chunk of pairs
+            n_chunks: Number of chunks the candidates are screened in
+            
+        Returns:
+            (cointegration_pvalues, adf_pvalues) as 1-D arrays with one
+            entry per candidate pair; the cointegration p-values come from
+            the Engle-Granger regression with intercept (batch_regressions),
+            the ADF p-values from the spreads built with hedge_ratios
+        """
+        if candidates is None:
+            candidates = np.triu_indices(prices.shape[1], 1)
+        rows, cols = candidates
+        n_pairs = len(rows)
+        if len(prices) < 30:
+            return np.ones(n_pairs), np.ones(n_pairs)  # Not enough data
+        
+        prices = np.asarray(prices, dtype=np.float64)
+        lags = _adf_lags(len(prices))
+        eg_slopes, eg_intercepts = StatisticalAnalyzer.batch_regressions(prices)
+        if NUMBA_AVAILABLE:
+            prices = np.asfortranarray(prices)
+        
+        # Engle-Granger and spread ADF statistics of every pair, run across
+        # all cores one chunk at a time so progress can be reported
+        coint_tstats = np.empty(n_pairs)
+        adf_tstats = np.empty(n_pairs)
+        bounds = np.linspace(0, n_pairs, min(n_chunks, n_pairs) + 1).astype(int)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            chunk_rows, chunk_cols = rows[start:stop], cols[start:stop]
+            if NUMBA_AVAILABLE:
+                coint_tstats[start:stop], adf_tstats[start:stop] = screen(
+                    prices, hedge_ratios, eg_slopes, eg_intercepts, chunk_rows, chunk_cols, lags
+                )
+            else:
+                from joblib import Parallel, delayed
+                tstats = np.array(Parallel(n_jobs=-1, prefer='processes')(
+                    delayed(_pair_tstat)(prices, hedge_ratios[i, j], eg_slopes[i, j],
+                                         eg_intercepts[i, j], i, j, lags)
+                    for i, j in zip(chunk_rows, chunk_cols)
+                ), dtype=np.float64).reshape(-1, 2)
+                coint_tstats[start:stop], adf_tstats[start:stop] = tstats[:, 0], tstats[:, 1]
+            if progress_callback is not None:
+                progress_callback(float(stop) / n_pairs)
+        
+        return tstat_to_coint_pvalue(coint_tstats), tstat_to_pvalue(adf_tstats)
+    
+    @staticmethod
+    def calculate_spread_stats(y: np.ndarray, x: np.ndarray, hedge_ratio: float) -> Tuple[float, float]:
+        """Calculate spread mean and standard deviation of two aligned price arrays"""
+        spread_mean, spread_std = spread_mean_std(y, x, float(hedge_ratio))
+        return float(spread_mean), float(spread_std)
+    
+    @staticmethod
+    def calculate_spread(y: np.ndarray, x: np.ndarray, hedge_ratio: float) -> np.ndarray:
+        """Calculate the spread between two aligned price arrays"""
+        return y - hedge_ratio * x
@@ -3,43 +3,99 @@ Data Manager - Handles market data fetching and storage
 ====================================================
 """
 
+import numpy as np
 import pandas as pd
-import yfinance as yf
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
+import hashlib
+import json
 import os
+import warnings
+
+
+def _close_prices(data) -> pd.Series:
+    """Reduce an OHLCV frame (or an existing close series) to float32 close prices"""
+    if isinstance(data, pd.DataFrame):
+        data = data['Close']
+    return data.dropna().astype(np.float32).rename('Close')
 
 
 class DataManager:
     """Handles all data fetching, cleaning, and storage operations"""
     
-    def __init__(self, start_date: str = "2019-01-01", end_date: str = "2024-01-01"):
+    def __init__(self, start_date: str = "2019-01-01", end_date: str = "2024-01-01",
+                 cache_dir: str = "data/cache"):
         self.start_date = start_date
         self.end_date = end_date
-        self.data = {}
+        self.cache_dir = cache_dir
+        self.data: Dict[str, pd.Series] = {}
+        self._X = None
+        self._X32 = None
+        self._index = None
+        self._sym_idx = {}
+    
+    def _invalidate_caches(self):
+        """Drop everything derived from self.data"""
+        self._X = None
+        self._X32 = None
+        self._index = None
+        self._sym_idx = {}
     
-    def fetch_stock_data(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+    def _cache_path(self, symbol: str) -> str:
+        """Path of the on-disk cache file for a symbol and the current date range"""
+        return os.path.join(self.cache_dir, f"{symbol}_{self.start_date}_{self.end_date}.parquet")
+    
+    def fetch_stock_data(self, symbols: List[str]) -> Dict[str, pd.Series]:
         """
         Fetch historical stock data for given symbols
         
+        Only close prices are kept, stored as float32.
+        
         Args:
             symbols: List of stock symbols to fetch
             
         Returns:
-            Dictionary with symbol as key and DataFrame as value
+            Dictionary with symbol as key and close price Series as value
         """
         print(f"Fetching data for {len(symbols)} symbols...")
+        self._invalidate_caches()
         
+        to_download = []
         for symbol in symbols:
+            cache_path = self._cache_path(symbol)
+            if os.path.exists(cache_path):
+                self.data[symbol] = _close_prices(pd.read_parquet(cache_path))
+                print(f"✓ {symbol}: {len(self.data[symbol])} records (cached)")
+            else:
+                to_download.append(symbol)
+        
+        if not to_download:
+            return self.data
+        
+        # One threaded request for every symbol that isn't cached yet;
+        # yfinance is slow to import, so only load it when we need it
+        import yfinance as yf
+        try:
+            raw = yf.download(tickers=' '.join(to_download), start=self.start_date, end=self.end_date,
+                              threads=True, group_by='ticker', auto_adjust=True, progress=False)
+        except Exception as e:
+            print(f"✗ Error fetching data - {e}")
+            return self.data
+        
+        if not isinstance(raw.columns, pd.MultiIndex):
+            raw = pd.concat({to_download[0]: raw}, axis=1)
+        
+        for symbol in to_download:
             try:
-                ticker = yf.Ticker(symbol)
-                data = ticker.history(start=self.start_date, end=self.end_date)
+                # Clean the data
+                data = _close_prices(raw.xs(symbol, axis=1, level=0))
                 
                 if not data.empty:
-                    # Clean the data
-                    data = data.dropna()
                     self.data[symbol] = data
                     print(f"✓ {symbol}: {len(data)} records")
+                    
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    data.to_frame().to_parquet(self._cache_path(symbol), compression='zstd')
                 else:
                     print(f"✗ {symbol}: No data available")
                     
@@ -48,13 +104,154 @@ class DataManager:
         
         return self.data
     
-    def get_price_series(self, symbol: str, price_type: str = 'Close') -> pd.Series:
-        """Get price series for a specific symbol"""
+    def get_price_series(self, symbol: str, price_type: Optional[str] = None) -> pd.Series:
+        """
+        Get the close price series for a specific symbol
+        
+        price_type is deprecated: only close prices are stored.
+        """
+        if price_type is not None:
+            warnings.warn("price_type is deprecated; only Close prices are stored",
+                          DeprecationWarning, stacklevel=2)
+            if price_type != 'Close':
+                raise ValueError(f"Only Close prices are stored, not {price_type}.")
+        
         if symbol in self.data:
-            return self.data[symbol][price_type]
+            return self.data[symbol]
         else:
             raise ValueError(f"Data for {symbol} not found. Please fetch data first.")
     
+    def build_aligned_matrix(self, symbols: List[str] = None) -> np.ndarray:
+        """
+        Align close prices of the given symbols once and keep the result
+        
+        Args:
+            symbols: Symbols to include (defaults to all available symbols)
+            
+        Returns:
+            (T, K) float64 matrix with contiguous columns, one per symbol
+        """
+        if symbols is None:
+            symbols = self.get_available_symbols()
+        symbols = [s for s in symbols if s in self.data]
+        if not symbols:
+            self._X = np.empty((0, 0))
+            self._X32 = None
+            self._index = pd.DatetimeIndex([])
+            self._sym_idx = {}
+            return self._X
+        
+        aligned_data = pd.concat({s: self.data[s] for s in symbols}, axis=1).dropna()
+        self._X = np.asfortranarray(aligned_data.to_numpy(dtype=np.float64))
+        self._X32 = None
+        self._index = aligned_data.index
+        self._sym_idx = {s: i for i, s in enumerate(aligned_data.columns)}
+        return self._X
+    
+    def get_price_matrix(self, symbols: List[str] = None,
+                         dtype: type = np.float64) -> Tuple[np.ndarray, List[str]]:
+        """
+        Get the aligned close price matrix, building it only if the symbol set changed
+        
+        Args:
+            symbols: Symbols to include (defaults to all available symbols)
+            dtype: np.float64, or np.float32 for a C-ordered single precision
+                copy, made on first request
+            
+        Returns:
+            (prices, symbols) where prices is a (T, K) array whose columns
+            follow the returned symbol order
+        """
+        if symbols is None:
+            symbols = self.get_available_symbols()
+        symbols = [s for s in symbols if s in self.data]
+        
+        # Only the set matters: callers index by the returned symbol order,
+        # which for a loaded matrix is the order it was saved in
+        if self._X is None or set(self._sym_idx) != set(symbols):
+            self.build_aligned_matrix(symbols)
+        if np.dtype(dtype) != np.float32:
+            return self._X, list(self._sym_idx)
+        if self._X32 is None:
+            self._X32 = np.ascontiguousarray(self._X, dtype=np.float32)
+        return self._X32, list(self._sym_idx)
+    
+    def get_prices(self, symbol1: str, symbol2: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the aligned price columns of two symbols, whatever the matrix column order"""
+        if self._X is None:
+            raise ValueError("Aligned matrix not built. Please call build_aligned_matrix first.")
+        return self._X[:, self._sym_idx[symbol1]], self._X[:, self._sym_idx[symbol2]]
+    
+    def aligned_cache_path(self, symbols: List[str]) -> str:
+        """Directory for the saved aligned matrix of a symbol set and the current date range"""
+        key = hashlib.blake2b(','.join(sorted(symbols)).encode()
+                              + self.start_date.encode() + self.end_date.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, "aligned", key)
+    
+    def data_fingerprint(self, symbols: List[str]) -> str:
+        """
+        Cheap fingerprint of the close price series of the given symbols
+        
+        Covers each series' length, first and last date, last value and sum,
+        so appended or revised (e.g. re-adjusted) prices change it without
+        hashing every value.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        for symbol in sorted(symbols):
+            series = self.data[symbol]
+            h.update(symbol.encode())
+            if len(series):
+                dates = series.index.asi8
+                values = series.to_numpy()
+                h.update(np.array([len(dates), dates[0], dates[-1]], dtype=np.int64).tobytes())
+                h.update(np.array([values[-1], values.sum(dtype=np.float64)]).tobytes())
+        return h.hexdigest()
+    
+    def save_aligned(self, path: str):
+        """Save the aligned price matrix, its dates, symbols and a fingerprint of the source data to a directory"""
+        if self._X is None:
+            raise ValueError("Aligned matrix not built. Please call build_aligned_matrix first.")
+        
+        os.makedirs(path, exist_ok=True)
+        index = pd.DatetimeIndex(self._index)
+        np.save(os.path.join(path, "prices.npy"), self._X)
+        np.save(os.path.join(path, "index.npy"), index.as_unit('ns').asi8)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"symbols": list(self._sym_idx),
+                       "tz": str(index.tz) if index.tz is not None else None,
+                       "data_fingerprint": self.data_fingerprint(list(self._sym_idx))}, f)
+    
+    def load_aligned(self, path: str) -> bool:
+        """
+        Load an aligned price matrix saved by save_aligned
+        
+        The price matrix is memory-mapped read-only rather than read into
+        memory. It is only used if it was built from the series currently
+        in self.data.
+        
+        Returns:
+            True if the matrix was loaded, False if path holds no saved matrix
+            or the saved matrix is stale
+        """
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            return False
+        
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if not all(s in self.data for s in meta["symbols"]):
+            return False
+        if meta.get("data_fingerprint") != self.data_fingerprint(meta["symbols"]):
+            return False
+        self._X = np.load(os.path.join(path, "prices.npy"), mmap_mode='r')
+        self._X32 = None
+        self._index = pd.to_datetime(np.load(os.path.join(path, "index.npy")), unit='ns',
+                                     utc=meta["tz"] is not None)
+        if meta["tz"] is not None:
+            self._index = self._index.tz_convert(meta["tz"])
+        self._sym_idx = {s: i for i, s in enumerate(meta["symbols"])}
+        return True
+    
     def get_available_symbols(self) -> List[str]:
         """Get list of available symbols"""
         return list(self.data.keys())
@@ -70,7 +267,8 @@ class DataManager:
     def load_data(self, filepath: str = "data/processed/market_data.pkl"):
         """Load data from disk"""
         if os.path.exists(filepath):
-            self.data = pd.read_pickle(filepath)
+            self.data = {s: _close_prices(d) for s, d in pd.read_pickle(filepath).items()}
+            self._invalidate_caches()
             print(f"Data loaded from {filepath}")
         else:
             print(f"File {filepath} not found")
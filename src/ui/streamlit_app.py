@@ -25,26 +25,18 @@ sys.path.insert(0, str(src_path))
 # Now import our modules
 try:
     from src.data.data_manager import DataManager
-    from src.analysis.pairs_finder import PairsFinder, TradingPair
+    from src.analysis.pairs_finder import PairsFinder, PairScreenResult, TradingPair
     from src.analysis.statistical import StatisticalAnalyzer
 except ImportError:
     try:
         from data.data_manager import DataManager
-        from analysis.pairs_finder import PairsFinder, TradingPair
+        from analysis.pairs_finder import PairsFinder, PairScreenResult, TradingPair
         from analysis.statistical import StatisticalAnalyzer
     except ImportError as e:
         st.error(f"Critical import error: {e}")
         st.error("Please check the project structure")
         st.stop()
 
-# Import plotly
-try:
-    import plotly.graph_objects as go
-    import plotly.express as px
-except ImportError:
-    st.error("Plotly not installed. Please run: pip install plotly")
-    st.stop()
-
 
 def initialize_session_state():
     """Initialize session state variables"""
@@ -56,6 +48,23 @@ def initialize_session_state():
         st.session_state.selected_pair = None
 
 
+@st.cache_data(show_spinner=False, max_entries=128)
+def screen_pairs_cached(symbols: tuple, start_date: str, end_date: str, corr_threshold: float,
+                        data_hash: str, _data_manager: DataManager) -> PairScreenResult:
+    """
+    Run the pair sweep once per symbol set, date range and price data
+    
+    The p-value thresholds are applied afterwards, so changing them reuses
+    the cached result. The progress bar is created in here so a cache hit
+    can replay it.
+    """
+    pairs_finder = PairsFinder(_data_manager, corr_threshold=corr_threshold)
+    progress_bar = st.progress(0.0)
+    result = pairs_finder.screen_pairs(list(symbols), progress_bar.progress)
+    progress_bar.empty()
+    return result
+
+
 def sidebar_navigation():
     """Create sidebar navigation"""
     st.sidebar.title("🎯 Pairs Trading Bot")
@@ -147,7 +156,7 @@ def show_data_management():
                                 'Records': len(data),
                                 'Start Date': data.index[0].strftime('%Y-%m-%d'),
                                 'End Date': data.index[-1].strftime('%Y-%m-%d'),
-                                'Current Price': f"${data['Close'].iloc[-1]:.2f}"
+                                'Current Price': f"${data.iloc[-1]:.2f}"
                             })
                         
                         st.dataframe(pd.DataFrame(summary_data), use_container_width=True)
@@ -169,7 +178,7 @@ def show_pairs_discovery():
     st.markdown("Discover statistically cointegrated pairs for trading")
     
     # Parameters
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         cointegration_threshold = st.slider(
@@ -186,6 +195,13 @@ def show_pairs_discovery():
         )
     
     with col3:
+        corr_threshold = st.slider(
+            "Correlation threshold:",
+            0.0, 1.0, 0.8, 0.05,
+            help="Only pairs with at least this log-price correlation are tested"
+        )
+    
+    with col4:
         min_observations = st.number_input(
             "Minimum observations:",
             min_value=50, max_value=1000, value=252,
@@ -199,13 +215,34 @@ def show_pairs_discovery():
                 pairs_finder = PairsFinder(
                     st.session_state.data_manager,
                     cointegration_threshold=cointegration_threshold,
-                    adf_threshold=adf_threshold
+                    adf_threshold=adf_threshold,
+                    corr_threshold=corr_threshold
                 )
                 
-                symbols = st.session_state.data_manager.get_available_symbols()
-                trading_pairs = pairs_finder.find_pairs(symbols)
+                data_manager = st.session_state.data_manager
+                symbols = data_manager.get_available_symbols()
+                
+                # Reuse the aligned price matrix saved by an earlier run
+                aligned_path = data_manager.aligned_cache_path(symbols)
+                if not data_manager.load_aligned(aligned_path):
+                    data_manager.build_aligned_matrix(symbols)
+                    data_manager.save_aligned(aligned_path)
+                
+                screen_result = screen_pairs_cached(
+                    tuple(symbols),
+                    data_manager.start_date,
+                    data_manager.end_date,
+                    corr_threshold,
+                    data_manager.data_fingerprint(symbols),
+                    data_manager
+                )
+                trading_pairs = pairs_finder.select_pairs(screen_result)
                 st.session_state.trading_pairs = trading_pairs
                 
+                total_combinations = len(screen_result.adf_pvalues)
+                st.info(f"ℹ️ Tested {screen_result.n_candidates} of {total_combinations} pairs "
+                        f"after the correlation prefilter")
+                
                 if trading_pairs:
                     st.success(f"✅ Found {len(trading_pairs)} valid trading pairs!")
                     
@@ -231,6 +268,15 @@ def show_pairs_discovery():
 def show_analysis():
     """Analysis Page"""
     st.header("📈 Pairs Analysis")
+    
+    # Plotly is only needed on this page, so it is imported here
+    try:
+        import plotly.graph_objects as go
+        import plotly.express as px
+    except ImportError:
+        st.error("Plotly not installed. Please run: pip install plotly")
+        return
+    
     st.info("�� Analysis functionality coming soon!")
 
 
@@ -0,0 +1,68 @@
+"""
+Aligned price matrix save/load round trips
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.data.data_manager import DataManager
+
+
+def _data_manager(cache_dir, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2023-01-02", periods=60, tz="America/New_York", name="Date")
+    dm = DataManager("2023-01-01", "2023-04-01", cache_dir=str(cache_dir))
+    dm.data = {
+        symbol: pd.Series((100 + np.cumsum(rng.normal(size=len(index)))).astype(np.float32),
+                          index=index, name="Close")
+        for symbol in ["AAA", "BBB", "CCC"]
+    }
+    return dm
+
+
+def _saved(tmp_path):
+    dm = _data_manager(tmp_path)
+    symbols = dm.get_available_symbols()
+    dm.build_aligned_matrix(symbols)
+    path = dm.aligned_cache_path(symbols)
+    dm.save_aligned(path)
+    return dm, path
+
+
+def test_round_trip_keeps_prices_dates_and_timezone(tmp_path):
+    dm, path = _saved(tmp_path)
+    
+    reloaded = _data_manager(tmp_path)
+    assert reloaded.load_aligned(path)
+    assert isinstance(reloaded._X, np.memmap)
+    np.testing.assert_array_equal(reloaded._X, dm._X)
+    assert reloaded._index.equals(dm._index)
+    assert str(reloaded._index.tz) == "America/New_York"
+
+
+def test_stale_prices_are_not_loaded(tmp_path):
+    _, path = _saved(tmp_path)
+    
+    revised = _data_manager(tmp_path)
+    revised.data["BBB"] = revised.data["BBB"] * np.float32(0.98)
+    assert not revised.load_aligned(path)
+    
+    missing = _data_manager(tmp_path)
+    del missing.data["CCC"]
+    assert not missing.load_aligned(path)
+
+
+def test_reversed_symbol_order_reuses_loaded_matrix(tmp_path):
+    dm, _ = _saved(tmp_path)
+    
+    reloaded = _data_manager(tmp_path)
+    symbols = reloaded.get_available_symbols()[::-1]
+    assert reloaded.load_aligned(reloaded.aligned_cache_path(symbols))
+    
+    prices, order = reloaded.get_price_matrix(symbols)
+    assert isinstance(prices, np.memmap)
+    assert order == ["AAA", "BBB", "CCC"]
+    np.testing.assert_array_equal(prices, dm._X)
+    
+    prices32, _ = reloaded.get_price_matrix(symbols, dtype=np.float32)
+    assert prices32.dtype == np.float32 and prices32.flags.c_contiguous
@@ -0,0 +1,33 @@
+"""
+Pair selection against the aligned price matrix
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.pairs_finder import PairsFinder
+from src.data.data_manager import DataManager
+
+
+def test_select_pairs_follows_symbols_when_matrix_is_reordered():
+    rng = np.random.default_rng(5)
+    index = pd.bdate_range("2022-01-03", periods=300, name="Date")
+    x = 100 + np.cumsum(rng.normal(size=len(index)))
+    dm = DataManager("2022-01-01", "2023-03-01")
+    dm.data = {
+        "A": pd.Series(x, index=index, name="Close").astype(np.float32),
+        "B": pd.Series(0.5 * x + rng.normal(size=len(index)), index=index, name="Close").astype(np.float32),
+        "C": pd.Series(300 + np.cumsum(rng.normal(size=len(index))), index=index, name="Close").astype(np.float32),
+    }
+    finder = PairsFinder(dm, cointegration_threshold=1.0, adf_threshold=1.0, corr_threshold=0.0)
+    result = finder.screen_pairs(["A", "B", "C"])
+    expected = finder.select_pairs(result)
+    
+    dm.build_aligned_matrix(["C", "B", "A"])
+    reordered = finder.select_pairs(result)
+    
+    assert [(p.symbol1, p.symbol2) for p in reordered] == [(p.symbol1, p.symbol2) for p in expected]
+    for got, want in zip(reordered, expected):
+        assert got.spread_mean == pytest.approx(want.spread_mean)
+        assert got.spread_std == pytest.approx(want.spread_std)
@@ -0,0 +1,68 @@
+"""
+Engle-Granger parity checks against statsmodels
+"""
+
+import numpy as np
+import pytest
+
+from src.analysis.statistical import StatisticalAnalyzer, _adf_lags
+
+coint = pytest.importorskip("statsmodels.tsa.stattools").coint
+
+
+def _random_walk(rng, n):
+    return 50.0 + np.cumsum(rng.normal(size=n))
+
+
+def _cointegrated_with(rng, x, intercept, slope, phi):
+    """intercept + slope * x + AR(1) noise"""
+    noise = np.zeros(len(x))
+    for t in range(1, len(x)):
+        noise[t] = phi * noise[t - 1] + rng.normal()
+    return intercept + slope * x + noise
+
+
+PAIRS = [(25.0, 1.5, 0.5), (-40.0, 0.8, 0.9), (0.0, 2.0, 0.7), (10.0, 1.0, 1.0)]
+
+
+@pytest.mark.parametrize("intercept,slope,phi", PAIRS)
+def test_cointegration_matches_statsmodels(intercept, slope, phi):
+    rng = np.random.default_rng(7)
+    x = _random_walk(rng, 500)
+    y = _cointegrated_with(rng, x, intercept, slope, phi)
+    
+    coint_pvalue, _, _ = StatisticalAnalyzer.test_cointegration(y, x)
+    _, expected, _ = coint(y, x, maxlag=_adf_lags(len(y)), autolag=None)
+    
+    assert coint_pvalue == pytest.approx(expected, abs=1e-4)
+
+
+def test_batch_cointegration_matches_single_pair():
+    rng = np.random.default_rng(11)
+    x = _random_walk(rng, 400)
+    prices = np.column_stack([x] + [_cointegrated_with(rng, x, *params) for params in PAIRS])
+    
+    hedge_ratios = StatisticalAnalyzer.batch_hedge_ratios(prices)
+    coint_pvalues, adf_pvalues = StatisticalAnalyzer.batch_cointegration(prices, hedge_ratios)
+    
+    rows, cols = np.triu_indices(prices.shape[1], 1)
+    for k, (i, j) in enumerate(zip(rows, cols)):
+        expected_coint, _, expected_adf = StatisticalAnalyzer.test_cointegration(prices[:, i], prices[:, j])
+        assert coint_pvalues[k] == pytest.approx(expected_coint, abs=1e-9)
+        assert adf_pvalues[k] == pytest.approx(expected_adf, abs=1e-9)
+
+
+def test_collinear_pair_is_not_cointegrated():
+    rng = np.random.default_rng(3)
+    x = _random_walk(rng, 300)
+    other = _random_walk(rng, 300)
+    prices = np.column_stack([x, 2.0 * x, other])
+    
+    coint_pvalue, hedge_ratio, adf_pvalue = StatisticalAnalyzer.test_cointegration(2.0 * x, x)
+    assert (coint_pvalue, adf_pvalue) == (1.0, 1.0)
+    assert hedge_ratio == pytest.approx(2.0)
+    
+    hedge_ratios = StatisticalAnalyzer.batch_hedge_ratios(prices)
+    coint_pvalues, adf_pvalues = StatisticalAnalyzer.batch_cointegration(prices, hedge_ratios)
+    assert coint_pvalues[0] == 1.0 and adf_pvalues[0] == 1.0
+    assert np.all(np.isfinite(coint_pvalues)) and np.all(np.isfinite(adf_pvalues))